@@ -1,16 +1,19 @@
 # config.py
 
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
-# Load environment variables from .env file if present
-load_dotenv()
+# Load environment variables from config/.env if present. This is the only
+# place .env is read; other modules import IB_CONFIG instead.
+load_dotenv(Path(__file__).resolve().parent / "config" / ".env")
 
 # IB API connection parameters
 IB_CONFIG = {
     "host": os.getenv("IB_HOST", "127.0.0.1"),
-    "port": int(os.getenv("IB_PORT", 4002)),
-    "client_id": int(os.getenv("IB_CLIENT_ID", 1))
+    "port": int(os.getenv("IB_PORT", 7497)),
+    "client_id": int(os.getenv("IB_CLIENT_ID", 1)),
+    "account": os.getenv("IB_ACCOUNT")
 }
 
 # Other configuration settings can be added here.
\ No newline at end of file
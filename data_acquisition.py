@@ -1,18 +1,67 @@
 # data_acquisition.py
-import yfinance as yf
+import hashlib
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
+import yfinance as yf
+
+# 磁盘缓存目录，按 (symbol, start, end) 的 SHA-256 存放 Parquet 文件
+CACHE_DIR = Path(__file__).resolve().parent / "cache"
 
 def get_historical_data(symbol: str, start: str, end: str) -> pd.DataFrame:
     """
     下载指定股票在[start, end]期间的历史数据。
     
+    结果先查进程内 LRU 缓存，再查磁盘 Parquet 缓存，均未命中时才请求 yfinance。
+    只有 end 早于今天的区间才写入磁盘缓存；包含今天或未来的区间数据尚不完整，
+    每个新进程都会重新下载。
+    
+    lru_cache 对相同参数返回的是同一个 DataFrame 对象，所有调用方共享它：
+    原地修改（增删列、赋值、inplace=True 等）会改变之后每次调用拿到的数据。
+    需要修改时请先调用 .copy()。
+    
     :param symbol: 股票代码，例如 'AAPL'
     :param start: 起始日期（格式 'YYYY-MM-DD'）
     :param end: 结束日期（格式 'YYYY-MM-DD'）
     :return: 包含历史数据的 pandas DataFrame
     """
+    return _fetch(symbol, start, end)
+
+@lru_cache(maxsize=256)
+def _fetch(symbol: str, start: str, end: str) -> pd.DataFrame:
+    key = hashlib.sha256(f"{symbol}|{start}|{end}".encode()).hexdigest()
+    path = CACHE_DIR / f"{key}.parquet"
+    # 区间未完全结束时数据仍会变化，不读也不写磁盘缓存
+    closed = pd.Timestamp(end).date() < date.today()
+    if closed and path.exists():
+        # self_destruct 让 Arrow 缓冲区在转换时即释放，避免同时持有两份数据
+        return pq.read_table(path).to_pandas(split_blocks=True, self_destruct=True)
+    
     print(f"正在下载 {symbol} 从 {start} 到 {end} 的历史数据...")
     data = yf.download(symbol, start=start, end=end)
     if data.empty:
         raise ValueError("下载的数据为空，请检查股票代码和日期区间！")
-    return data
\ No newline at end of file
+    if closed:
+        CACHE_DIR.mkdir(exist_ok=True)
+        data.to_parquet(path, engine="pyarrow", compression="zstd")
+    return data
+
+def get_historical_ohlcv_np(symbol: str, start: str, end: str) -> dict:
+    """
+    以 NumPy 数组形式返回 OHLCV 数据，可直接传给 TA-Lib 等指标函数。
+    
+    :param symbol: 股票代码，例如 'AAPL'
+    :param start: 起始日期（格式 'YYYY-MM-DD'）
+    :param end: 结束日期（格式 'YYYY-MM-DD'）
+    :return: {'open', 'high', 'low', 'close', 'volume'} 到一维 float64 数组的映射
+    """
+    data = get_historical_data(symbol, start, end)
+    # 单只股票的多级列会得到 (n, 1) 数组，reshape 成一维
+    return {
+        name.lower(): data[name].to_numpy(dtype=np.float64).reshape(-1)
+        for name in ("Open", "High", "Low", "Close", "Volume")
+    }
\ No newline at end of file
@@ -1,41 +1,55 @@
-import os
+"""
+IBKR connection wrapper.
+
+Settings come from the repository-level config module, so run this from the
+repository root as a module: ``python -m ibkr_quant.main``.
+"""
+
 import time
-from dotenv import load_dotenv
+import asyncio
 from ib_insync import *
 import logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from config import IB_CONFIG
+from src.core.logger import setup_logger
+from src.utils.retry import RETRYABLE_ERRORS, backoff_delay
+
 logger = logging.getLogger('IBKR Quant')
 
 class IBKRQuant:
     def __init__(self):
         self.ib = IB()
         self.connected = False
-        load_dotenv()
-        self.account = os.getenv('IB_ACCOUNT')
+        self.account = IB_CONFIG['account']
         
     def connect(self, retries: int = 3) -> bool:
         """Connect to IBKR TWS/Gateway with auto-reconnect"""
         for attempt in range(retries):
             try:
-                host = os.getenv('IB_HOST', '127.0.0.1')
-                port = int(os.getenv('IB_PORT', 7497))
-                client_id = int(os.getenv('IB_CLIENT_ID', 1))
-                
-                self.ib.connect(host, port, clientId=client_id)
+                self.ib.connect(IB_CONFIG['host'], IB_CONFIG['port'], clientId=IB_CONFIG['client_id'])
                 self.connected = True
-                logger.info(f"Successfully connected to IBKR (Account: {self.account})")
+                logger.info("Successfully connected to IBKR (Account: %s)", self.account)
                 return True
-            except Exception as e:
-                wait_time = 2 ** attempt
-                logger.error(f"Connection failed (attempt {attempt+1}): {str(e)}. Retrying in {wait_time}s")
+            except RETRYABLE_ERRORS as e:
+                wait_time = backoff_delay(attempt)
+                logger.error("Connection failed (attempt %d): %s. Retrying in %.1fs", attempt + 1, e, wait_time)
                 time.sleep(wait_time)
         return False
 
+    async def connect_async(self, retries: int = 3) -> bool:
+        """Connect to IBKR on the running event loop, backing off without blocking it"""
+        for attempt in range(retries):
+            try:
+                await self.ib.connectAsync(IB_CONFIG['host'], IB_CONFIG['port'], clientId=IB_CONFIG['client_id'])
+                self.connected = True
+                logger.info("Successfully connected to IBKR (Account: %s)", self.account)
+                return True
+            except RETRYABLE_ERRORS as e:
+                wait_time = backoff_delay(attempt)
+                logger.error("Connection failed (attempt %d): %s. Retrying in %.1fs", attempt + 1, e, wait_time)
+                await asyncio.sleep(wait_time)
+        return False
+
     def get_account_summary(self):
         """Get account summary information"""
         if not self.connected:
@@ -50,6 +64,7 @@ class IBKRQuant:
             logger.info("Disconnected from IBKR")
 
 if __name__ == "__main__":
+    setup_logger()
     bot = IBKRQuant()
     if bot.connect():
         print("Connection successful!")
@@ -2,12 +2,14 @@ import asyncio
 
 from ib_async import *
 
+from config import IB_CONFIG
+
 
 async def main():
 
     ib = IB()
-    ib.connect('127.0.0.1', 7497, clientId=1)
-    print(await ib.reqCurrentTime())
+    await ib.connectAsync(IB_CONFIG['host'], IB_CONFIG['port'], clientId=IB_CONFIG['client_id'])
+    print(await ib.reqCurrentTimeAsync())
 
 if __name__ == "__main__":
     asyncio.run(main())
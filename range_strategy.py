@@ -3,19 +3,99 @@ Range Trading Strategy Implementation
 """
 
 import math
+import asyncio
 import logging
 from datetime import datetime, time
+import numpy as np
 import pandas as pd
 import talib
 from ib_insync import *
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+try:
+    from numba import njit
+except ImportError:  # numba is optional; run the kernel as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
 logger = logging.getLogger('RangeStrategy')
 
+
+# Layout of the streaming indicator state array
+(_BARS_SEEN, _PREV_HIGH, _PREV_LOW, _PREV_CLOSE, _ATR, _PLUS_DM_S, _MINUS_DM_S,
+ _TR_S, _ADX, _RSI_AVG_GAIN, _RSI_AVG_LOSS, _RSI, _BB_SUM, _BB_SUMSQ,
+ _BB_UPPER, _BB_MIDDLE, _BB_LOWER, _STATE_SIZE) = range(18)
+
+
+@njit(cache=True)
+def _streaming_update(high, low, close, dropped, state,
+                      atr_period, adx_period, rsi_period, bb_period, bb_std_dev):
+    """
+    Fold one bar into the indicator state in place.
+    
+    ATR and RSI use Wilder smoothing, seeded with a running mean until each
+    period is filled. ADX smooths +DM, -DM and TR in TA-Lib's sum form, seeded
+    with the sum of the first period - 1 values. Bollinger Bands use running
+    sums; `dropped` is the close leaving the window, or NaN while the window
+    is still filling.
+    """
+    bars_seen = state[_BARS_SEEN]
+    
+    # Bollinger Bands
+    state[_BB_SUM] += close
+    state[_BB_SUMSQ] += close * close
+    if not math.isnan(dropped):
+        state[_BB_SUM] -= dropped
+        state[_BB_SUMSQ] -= dropped * dropped
+    n = min(bars_seen + 1, bb_period)
+    mean = state[_BB_SUM] / n
+    band = bb_std_dev * math.sqrt(max(state[_BB_SUMSQ] / n - mean * mean, 0.0))
+    state[_BB_UPPER] = mean + band
+    state[_BB_MIDDLE] = mean
+    state[_BB_LOWER] = mean - band
+    
+    if bars_seen > 0:
+        prev_close = state[_PREV_CLOSE]
+        tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        
+        # ATR
+        state[_ATR] += (tr - state[_ATR]) / min(bars_seen, atr_period)
+        
+        # ADX; plain sums over the first period - 1 bars, then S - S/N + x,
+        # exactly as TA-Lib seeds it
+        up_move = high - state[_PREV_HIGH]
+        down_move = state[_PREV_LOW] - low
+        plus_dm = up_move if up_move > down_move and up_move > 0 else 0.0
+        minus_dm = down_move if down_move > up_move and down_move > 0 else 0.0
+        if bars_seen >= adx_period:
+            state[_PLUS_DM_S] -= state[_PLUS_DM_S] / adx_period
+            state[_MINUS_DM_S] -= state[_MINUS_DM_S] / adx_period
+            state[_TR_S] -= state[_TR_S] / adx_period
+        state[_PLUS_DM_S] += plus_dm
+        state[_MINUS_DM_S] += minus_dm
+        state[_TR_S] += tr
+        if bars_seen >= adx_period and state[_TR_S] > 0:
+            plus_di = state[_PLUS_DM_S] / state[_TR_S]
+            minus_di = state[_MINUS_DM_S] / state[_TR_S]
+            di_sum = plus_di + minus_di
+            dx = 100 * abs(plus_di - minus_di) / di_sum if di_sum > 0 else 0.0
+            state[_ADX] += (dx - state[_ADX]) / min(bars_seen - adx_period + 1, adx_period)
+        
+        # RSI
+        change = close - prev_close
+        n = min(bars_seen, rsi_period)
+        state[_RSI_AVG_GAIN] += (max(change, 0.0) - state[_RSI_AVG_GAIN]) / n
+        state[_RSI_AVG_LOSS] += (max(-change, 0.0) - state[_RSI_AVG_LOSS]) / n
+        total = state[_RSI_AVG_GAIN] + state[_RSI_AVG_LOSS]
+        state[_RSI] = 100 * state[_RSI_AVG_GAIN] / total if total > 0 else 0.0
+    
+    state[_PREV_HIGH] = high
+    state[_PREV_LOW] = low
+    state[_PREV_CLOSE] = close
+    state[_BARS_SEEN] = bars_seen + 1
+
+
 class RangeStrategy:
     def __init__(self, ib=None, symbol=None, config=None):
         """
@@ -43,19 +123,38 @@ class RangeStrategy:
         """
         self.ib = ib
         self.symbol = symbol
+        self.contract = Stock(symbol, 'SMART', 'USD')
         self.config = self._validate_config(config)
         self.position = None  # Current position (None, 'long', or 'short')
         
-        # Initialize data structures
-        self.historical_data = pd.DataFrame()
+        # Fixed-size OHLCV ring buffer. Every bar is written twice (at idx and
+        # idx + N) so the latest N bars are always a contiguous slice.
+        self._buffer_size = self.config['_buffer_size']
+        self._buf = {
+            col: np.empty(2 * self._buffer_size, dtype=np.float64)
+            for col in ('open', 'high', 'low', 'close', 'volume')
+        }
+        self._head = 0
+        self._filled = 0
         self.current_price = None
+        self._last_bar_time = None
         self.latest_empty = False
+        self._running = False
         
-        # Indicators
-        self.adx = None
-        self.bollinger = None
-        self.rsi = None
-        self.atr = None
+        # Streaming indicator state, updated in O(1) per bar by _streaming_update
+        self._state = np.zeros(_STATE_SIZE, dtype=np.float64)
+        self._warmup_bars = max(self.config['atr_period'] + 1,
+                                self.config['rsi_period'] + 1,
+                                2 * self.config['adx_period'],
+                                self.config['bollinger_ma_period'])
+        # Latest indicator values as plain scalars; NaN until the first bar
+        self._atr = self._adx = self._rsi = math.nan
+        self._bb_upper = self._bb_middle = self._bb_lower = math.nan
+        
+        # Account values pushed by IBKR, kept current by accountValueEvent;
+        # the account is resolved in run() when not configured
+        self._account = self.config['account']
+        self._account_cache = {}
         
         # Tracking
         self.trades_today = 0
@@ -79,110 +178,158 @@ class RangeStrategy:
             'max_trades_per_day': 5,
             'daily_loss_limit_pct': 0.02,
             'trade_start_time': time(9, 35),
-            'trade_end_time': time(15, 55)
+            'trade_end_time': time(15, 55),
+            'account': None
         }
-        return {**defaults, **(config or {})}
+        cfg = {**defaults, **(config or {})}
+        
+        # Periods size buffers and IBKR duration strings; UIs may pass them as floats
+        for key in ('adx_period', 'bollinger_ma_period', 'rsi_period', 'atr_period'):
+            cfg[key] = int(cfg[key])
+        
+        # Derived sizes, computed once instead of per bar
+        cfg['_max_period'] = max(cfg['adx_period'], cfg['bollinger_ma_period'], cfg['rsi_period'])
+        cfg['_buffer_size'] = cfg['_max_period'] + 20
+        
+        # Trading window as minutes since midnight for cheap per-bar comparisons
+        cfg['_trade_start_min'] = cfg['trade_start_time'].hour * 60 + cfg['trade_start_time'].minute
+        cfg['_trade_end_min'] = cfg['trade_end_time'].hour * 60 + cfg['trade_end_time'].minute
+        return cfg
     
+    def _window(self, column):
+        """Return the buffered bars of a column, oldest first, as a contiguous view"""
+        start = (self._head - self._filled) % self._buffer_size
+        return self._buf[column][start:start + self._filled]
+
+    @property
+    def historical_data(self):
+        """Buffered OHLCV bars as a DataFrame snapshot, built in a single constructor call"""
+        return pd.DataFrame({col: self._window(col) for col in self._buf}, copy=True)
+
     def calculate_indicators(self):
-        """Calculate all technical indicators using TA-Lib"""
-        if len(self.historical_data) < max(self.config['adx_period'], 
-                                         self.config['bollinger_ma_period'],
-                                         self.config['rsi_period']):
-            return
+        """Update all technical indicators with the latest bar in O(1)"""
+        period = self.config['bollinger_ma_period']
+        idx = (self._head - 1) % self._buffer_size
+        # Close leaving the Bollinger window; the ring buffer is always longer than the period
+        dropped = (self._buf['close'][(self._head - 1 - period) % self._buffer_size]
+                   if self._filled > period else math.nan)
         
-        # Calculate ADX
-        self.adx = talib.ADX(
-            self.historical_data['high'],
-            self.historical_data['low'],
-            self.historical_data['close'],
-            timeperiod=self.config['adx_period']
+        state = self._state
+        _streaming_update(
+            self._buf['high'][idx],
+            self._buf['low'][idx],
+            self._buf['close'][idx],
+            dropped,
+            state,
+            self.config['atr_period'],
+            self.config['adx_period'],
+            self.config['rsi_period'],
+            period,
+            self.config['bollinger_std_dev']
         )
-        
-        # Calculate Bollinger Bands
+        self._atr = state[_ATR]
+        self._adx = state[_ADX]
+        self._rsi = state[_RSI]
+        self._bb_upper = state[_BB_UPPER]
+        self._bb_middle = state[_BB_MIDDLE]
+        self._bb_lower = state[_BB_LOWER]
+    
+    @property
+    def adx(self):
+        """ADX series over the buffered bars, recomputed with TA-Lib for diagnostics"""
+        return talib.ADX(self._window('high'), self._window('low'), self._window('close'),
+                         timeperiod=self.config['adx_period'])
+    
+    @property
+    def bollinger(self):
+        """Bollinger Band series over the buffered bars, recomputed with TA-Lib for diagnostics"""
         upper, middle, lower = talib.BBANDS(
-            self.historical_data['close'],
+            self._window('close'),
             timeperiod=self.config['bollinger_ma_period'],
             nbdevup=self.config['bollinger_std_dev'],
             nbdevdn=self.config['bollinger_std_dev'],
             matype=0
         )
-        self.bollinger = {
-            'upper': upper,
-            'middle': middle,
-            'lower': lower
-        }
-        
-        # Calculate RSI
-        self.rsi = talib.RSI(
-            self.historical_data['close'],
-            timeperiod=self.config['rsi_period']
-        )
-        
-        # Calculate ATR
-        self.atr = talib.ATR(
-            self.historical_data['high'],
-            self.historical_data['low'],
-            self.historical_data['close'],
-            timeperiod=self.config['atr_period']
-        )
+        return {'upper': upper, 'middle': middle, 'lower': lower}
+    
+    @property
+    def rsi(self):
+        """RSI series over the buffered bars, recomputed with TA-Lib for diagnostics"""
+        return talib.RSI(self._window('close'), timeperiod=self.config['rsi_period'])
+    
+    @property
+    def atr(self):
+        """ATR series over the buffered bars, recomputed with TA-Lib for diagnostics"""
+        return talib.ATR(self._window('high'), self._window('low'), self._window('close'),
+                         timeperiod=self.config['atr_period'])
+    
+    @property
+    def indicators_ready(self):
+        """Whether every indicator has seen enough bars to be meaningful"""
+        return self._state[_BARS_SEEN] >= self._warmup_bars
     
     def update_market_data(self, bar):
         """Update market data with latest bar"""
-        new_row = {
-            'timestamp': bar.time,
-            'open': bar.open,
-            'high': bar.high,
-            'low': bar.low,
-            'close': bar.close,
-            'volume': bar.volume
-        }
-        self.historical_data = pd.concat([
-            self.historical_data,
-            pd.DataFrame([new_row])
-        ]).tail(max(self.config['adx_period'],
-                   self.config['bollinger_ma_period'],
-                   self.config['rsi_period']) + 20)
+        idx = self._head % self._buffer_size
+        for col, value in (('open', bar.open), ('high', bar.high), ('low', bar.low),
+                           ('close', bar.close), ('volume', bar.volume)):
+            buf = self._buf[col]
+            buf[idx] = buf[idx + self._buffer_size] = value
+        self._head += 1
+        self._filled = min(self._filled + 1, self._buffer_size)
         
         self.current_price = bar.close
+        self._last_bar_time = bar.date
         self.calculate_indicators()
     
     def evaluate_entry(self):
         """Evaluate if conditions are met for entry"""
-        if self.position:
-            return False
-            
-        # Check if market is in range
-        if self.adx[-1] > self.config['adx_threshold']:
+        if self.position or not self.indicators_ready:
             return False
-            
-        # Check price near lower Bollinger Band
-        if not (self.current_price <= self.bollinger['lower'][-1]):
-            return False
-            
-        # Check RSI oversold
-        if self.rsi[-1] > self.config['rsi_oversold']:
-            return False
-            
-        # Check if within trading hours
-        now = datetime.now().time()
-        if not (self.config['trade_start_time'] <= now <= self.config['trade_end_time']):
-            return False
-            
-        # Check daily trade limit
-        if self.trades_today >= self.config['max_trades_per_day']:
-            return False
-            
-        # Check daily loss limit
-        if self.daily_pnl <= -self.config['daily_loss_limit_pct']:
-            return False
-            
-        return True
+        
+        cfg = self.config
+        bar_min = self._last_bar_time.hour * 60 + self._last_bar_time.minute
+        # Range-bound market, price at the lower band, RSI oversold, inside the
+        # trading window, and daily trade/loss limits not yet hit
+        return bool(
+            (self._adx <= cfg['adx_threshold'])
+            & (self.current_price <= self._bb_lower)
+            & (self._rsi <= cfg['rsi_oversold'])
+            & (cfg['_trade_start_min'] <= bar_min <= cfg['_trade_end_min'])
+            & (self.trades_today < cfg['max_trades_per_day'])
+            & (self.daily_pnl > -cfg['daily_loss_limit_pct'])
+        )
+    
+    def entry_signals(self, adx, close, bb_lower, rsi, bar_minutes):
+        """
+        Vectorized form of the evaluate_entry indicator rules for backtesting
+        
+        Trade-count and daily-loss limits depend on the trade path and are left
+        to the caller.
+        
+        Args:
+            adx, close, bb_lower, rsi (np.ndarray): Per-bar values
+            bar_minutes (np.ndarray): Bar time as minutes since midnight
+        
+        Returns:
+            np.ndarray: Boolean entry mask, one element per bar
+        """
+        cfg = self.config
+        return ((adx <= cfg['adx_threshold'])
+                & (close <= bb_lower)
+                & (rsi <= cfg['rsi_oversold'])
+                & (bar_minutes >= cfg['_trade_start_min'])
+                & (bar_minutes <= cfg['_trade_end_min']))
 
     def calculate_position_size(self, price):
         """Calculate position size based on risk management rules"""
-        account_value = self.ib.accountSummary('TotalCashValue')[0].value
+        account_value = self._account_cache.get('TotalCashValue')
+        if account_value is None:
+            logger.warning("No TotalCashValue received for account %s; not sizing a position "
+                           "(set 'account' when logged in to several accounts)", self._account)
+            return 0
         risk_amount = float(account_value) * self.config['risk_per_trade_pct']
-        stop_distance = self.atr[-1] * self.config['stop_loss_atr_multiplier']
+        stop_distance = self._atr * self.config['stop_loss_atr_multiplier']
         return math.floor(risk_amount / stop_distance)
 
     def execute_trade(self):
@@ -194,21 +341,22 @@ class RangeStrategy:
         if quantity <= 0:
             return
             
-        # Calculate order prices
+        # Calculate order prices, rounded to the stock tick so IBKR accepts them
         entry_price = self.current_price
-        stop_price = entry_price - (self.atr[-1] * self.config['stop_loss_atr_multiplier'])
-        target_price = entry_price * (1 + self.config['profit_target_pct'])
-        
-        # Create bracket order
-        contract = Stock(self.symbol, 'SMART', 'USD')
-        parent = MarketOrder('BUY', quantity)
-        take_profit = LimitOrder('SELL', quantity, target_price)
-        stop_loss = StopOrder('SELL', quantity, stop_price)
+        stop_price = round(entry_price - (self._atr * self.config['stop_loss_atr_multiplier']), 2)
+        target_price = round(entry_price * (1 + self.config['profit_target_pct']), 2)
         
-        # Submit orders
-        trade = self.ib.placeOrder(contract, parent)
-        self.ib.placeOrder(contract, take_profit)
-        self.ib.placeOrder(contract, stop_loss)
+        # Submit parent + take profit + stop loss as one linked bracket;
+        # only the last order transmits, releasing the whole group at once
+        bracket = self.ib.bracketOrder(
+            'BUY',
+            quantity,
+            limitPrice=entry_price,
+            takeProfitPrice=target_price,
+            stopLossPrice=stop_price
+        )
+        for order in bracket:
+            self.ib.placeOrder(self.contract, order)
         
         # Update position tracking
         self.position = {
@@ -251,33 +399,70 @@ class RangeStrategy:
             'duration': (datetime.now() - self.position['entry_time']).total_seconds(),
             'reason': reason
         }
-        logger.info(f"Trade closed: {trade_details}")
+        logger.info("Trade closed: %s", trade_details)
         
         # Reset position
         self.position = None
         self.last_trade = trade_details
         
-    def run(self):
-        """Main trading loop"""
-        while True:
-            # Get latest market data
-            bars = self.ib.reqHistoricalData(
-                Stock(self.symbol, 'SMART', 'USD'),
-                endDateTime='',
-                durationStr='1 D',
-                barSizeSetting='1 min',
-                whatToShow='TRADES',
-                useRTH=True,
-                formatDate=1
-            )
-            self.update_market_data(bar[-1])
-            
-            # Manage existing position
-            self.manage_position()
-            
-            # Evaluate new trade
-            if not self.position:
-                self.execute_trade()
-                
-            # Sleep until next iteration
-            time.sleep(60)
+    def _on_account_value(self, value):
+        """Cache account values needed for position sizing"""
+        # TotalCashValue arrives once per currency; only the BASE total is the full balance
+        if value.tag == 'TotalCashValue' and value.currency == 'BASE' and value.account == self._account:
+            self._account_cache[value.tag] = value.value
+    
+    def _on_bar(self, bars, has_new_bar):
+        """Handle a streamed 1-minute bar update"""
+        if not has_new_bar or len(bars) < 2:
+            return
+        # The last bar has just opened; the one before it is complete
+        self.update_market_data(bars[-2])
+        
+        # Manage existing position
+        self.manage_position()
+        
+        # Evaluate new trade
+        if not self.position:
+            self.execute_trade()
+    
+    async def run(self):
+        """Main trading loop, driven by streamed bar updates"""
+        await self.ib.qualifyContractsAsync(self.contract)
+        
+        # Request only enough history to seed the indicators, then keep it streaming
+        seed_bars = max(self._buffer_size, self._warmup_bars)
+        bars = await self.ib.reqHistoricalDataAsync(
+            self.contract,
+            endDateTime='',
+            durationStr=f'{seed_bars * 60} S',
+            barSizeSetting='1 min',
+            whatToShow='TRADES',
+            useRTH=True,
+            formatDate=1,
+            keepUpToDate=True
+        )
+        for bar in bars[:-1]:
+            self.update_market_data(bar)
+        
+        if self._account is None:
+            # Unambiguous only on a single-account login
+            accounts = self.ib.managedAccounts()
+            self._account = accounts[0] if len(accounts) == 1 else None
+        for value in self.ib.accountValues():
+            self._on_account_value(value)
+        self.ib.accountValueEvent += self._on_account_value
+        bars.updateEvent += self._on_bar
+        
+        self._running = True
+        try:
+            # Bars arrive via events; this loop only keeps the task alive
+            while self._running:
+                await asyncio.sleep(1)
+        finally:
+            self.ib.accountValueEvent -= self._on_account_value
+            bars.updateEvent -= self._on_bar
+            self.ib.cancelHistoricalData(bars)
+    
+    def stop(self):
+        """Stop the trading loop started by run()"""
+        self._running = False
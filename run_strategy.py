@@ -3,10 +3,11 @@ Main script to run the range trading strategy
 """
 
 import json
-import time
+import asyncio
 from datetime import time as dt_time
-from ib_insync import *
+from ibkr_quant.main import IBKRQuant
 from range_strategy import RangeStrategy
+from src.core.logger import setup_logger
 
 def load_config(config_path):
     """Load strategy configuration from JSON file"""
@@ -19,28 +20,33 @@ def load_config(config_path):
     
     return config
 
-def main():
+async def main():
     # Load configuration
     config = load_config('strategy_config.json')
     
-    # Connect to IBKR
-    ib = IB()
-    ib.connect('127.0.0.1', 7497, clientId=1)
+    # Connect to IBKR on the same event loop that drives the strategy
+    bot = IBKRQuant()
+    if not await bot.connect_async():
+        print("Could not connect to IBKR")
+        return
     
-    # Initialize strategy
+    # Initialize strategy; position sizing reads the configured account's balance
+    config.setdefault('account', bot.account)
     strategy = RangeStrategy(
-        ib=ib,
+        ib=bot.ib,
         symbol='AAPL',  # Default symbol, can be parameterized
         config=config
     )
     
     try:
         # Start trading loop
-        strategy.run()
-    except KeyboardInterrupt:
-        print("Shutting down strategy...")
+        await strategy.run()
     finally:
-        ib.disconnect()
+        bot.disconnect()
 
 if __name__ == '__main__':
-    main()
+    setup_logger()
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("Shutting down strategy...")
@@ -1,22 +1,19 @@
-import os
 import time
-import dotenv
+import asyncio
 from ib_async.ib import IB
 from typing import Dict
 
-dotenv.load_dotenv()
+# Repository-level config module; import this file with the repository root on sys.path
+from config import IB_CONFIG
+from src.utils.retry import RETRYABLE_ERRORS, backoff_delay
 
 class IBKRConnection:
     """Synchronous IBKR connection manager with auto-reconnect"""
 
     def __init__(self):
         self.ib = IB()
-        # Set connection details AFTER creating IB()
-        self.ib.host = os.getenv("IB_HOST", "127.0.0.1")
-        self.ib.port = int(os.getenv("IB_PORT", "7497"))
-        self.ib.client_id = int(os.getenv("IB_CLIENT_ID", "1"))
-
-        self.account = os.getenv("IB_ACCOUNT")
+        self.config = IB_CONFIG
+        self.account = IB_CONFIG["account"]
         self.connected = False
 
     def connect(self, retries: int = 3) -> bool:
@@ -24,16 +21,34 @@ class IBKRConnection:
         for attempt in range(retries):
             try:
                 # .connect() in ib_async blocks until it finishes or raises an error
-                self.ib.connect()
+                self.ib.connect(
+                    self.config["host"], self.config["port"], clientId=self.config["client_id"]
+                )
                 self.connected = True
                 print(f"✅ Connected to account: {self.account}")
                 return True
-            except ConnectionError as e:
-                wait_time = 2 ** attempt
-                print(f"⚠️ Connection failed (attempt {attempt+1}): Retrying in {wait_time}s")
+            except RETRYABLE_ERRORS as e:
+                wait_time = backoff_delay(attempt)
+                print(f"⚠️ Connection failed (attempt {attempt+1}): {e}. Retrying in {wait_time:.1f}s")
                 time.sleep(wait_time)
         return False
 
+    async def connect_async(self, retries: int = 3) -> bool:
+        """Establish a connection on the running event loop with non-blocking backoff."""
+        for attempt in range(retries):
+            try:
+                await self.ib.connectAsync(
+                    self.config["host"], self.config["port"], clientId=self.config["client_id"]
+                )
+                self.connected = True
+                print(f"✅ Connected to account: {self.account}")
+                return True
+            except RETRYABLE_ERRORS as e:
+                wait_time = backoff_delay(attempt)
+                print(f"⚠️ Connection failed (attempt {attempt+1}): {e}. Retrying in {wait_time:.1f}s")
+                await asyncio.sleep(wait_time)
+        return False
+
     def get_account_summary(self) -> Dict:
         """Fetch paper/live account summary (synchronous)."""
         if not self.connected:
@@ -1,10 +1,21 @@
 import logging
-from rich.logging import RichHandler  # Correct import path
 
-def setup_logger(name: str = "TradingBot") -> logging.Logger:
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(message)s",
-        handlers=[RichHandler(rich_tracebacks=True)]
-    )
-    return logging.getLogger(name)
\ No newline at end of file
+try:
+    from rich.logging import RichHandler  # Correct import path
+except ImportError:  # rich is optional; fall back to plain timestamped lines
+    RichHandler = None
+
+def setup_logger(name: str = "TradingBot", level: int = logging.INFO) -> logging.Logger:
+    """Configure root logging once from an entry point and return the named logger"""
+    if RichHandler is not None:
+        logging.basicConfig(
+            level=level,
+            format="%(message)s",
+            handlers=[RichHandler(rich_tracebacks=True)]
+        )
+    else:
+        logging.basicConfig(
+            level=level,
+            format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        )
+    return logging.getLogger(name)
@@ -1,8 +1,16 @@
 import yaml
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    from yaml import CSafeLoader as _Loader  # libyaml C bindings
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent.parent / "config" / "config.yaml"
+
+@lru_cache(maxsize=1)
 def load_config() -> dict:
-    """Load YAML configuration"""
-    config_path = Path(__file__).parent.parent / "../config/config.yaml"
-    with open(config_path) as f:
-        return yaml.safe_load(f)
\ No newline at end of file
+    """Load YAML configuration (parsed once per process)"""
+    with open(CONFIG_PATH) as f:
+        return yaml.load(f, Loader=_Loader)
\ No newline at end of file
@@ -0,0 +1,11 @@
+import asyncio
+import random
+
+# Only network failures are retried; anything else (e.g. a rejected client id)
+# surfaces immediately
+RETRYABLE_ERRORS = (ConnectionError, asyncio.TimeoutError, TimeoutError)
+
+def backoff_delay(attempt: int, cap: float = 30) -> float:
+    """Seconds to wait after a failed attempt: capped exponential backoff plus jitter,
+    so several client ids don't reconnect in lockstep"""
+    return min(cap, 2 ** attempt) + random.uniform(0, 0.5)
@@ -1,6 +1,26 @@
 # strategy.py
+import numpy as np
 import pandas as pd
 
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    基于累积和的滚动均值，等价于 rolling(window, min_periods=1).mean()。
+    与 pandas 一样跳过 NaN：每个窗口只对非 NaN 值求均值，窗口内全为 NaN 时结果为 NaN。
+    
+    :param values: 一维 float64 数组
+    :param window: 窗口长度
+    :return: 与 values 等长的均值数组
+    """
+    # NaN 按 0 计入累积和，并单独累计非 NaN 的个数，避免一个 NaN 污染之后所有窗口
+    valid = ~np.isnan(values)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    ccount = np.concatenate(([0], np.cumsum(valid)))
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - window, 0)
+    count = ccount[end] - ccount[start]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 0, (csum[end] - csum[start]) / count, np.nan)
+
 class MovingAverageCrossoverStrategy:
     def __init__(self, short_window: int = 20, long_window: int = 50):
         """
@@ -19,15 +39,23 @@ class MovingAverageCrossoverStrategy:
         :param data: 包含 'Close' 列的价格数据 DataFrame
         :return: 包含信号和仓位变动的 DataFrame
         """
-        signals = pd.DataFrame(index=data.index)
-        signals['signal'] = 0.0
-        
-        # 计算短期和长期均线
-        signals['short_mavg'] = data['Close'].rolling(window=self.short_window, min_periods=1).mean()
-        signals['long_mavg'] = data['Close'].rolling(window=self.long_window, min_periods=1).mean()
+        # 直接在底层 ndarray 上计算短期和长期均线，绕开 pandas rolling 的开销
+        close = data['Close'].to_numpy(dtype=np.float64)
+        short_mavg = _rolling_mean(close, self.short_window)
+        long_mavg = _rolling_mean(close, self.long_window)
         
         # 当短期均线上穿长期均线时产生买入信号，反之卖出
-        signals['signal'] = (signals['short_mavg'] > signals['long_mavg']).astype(float)
-        signals['positions'] = signals['signal'].diff()
+        signal = (short_mavg > long_mavg).astype(np.float64)
+        positions = np.empty_like(signal)
+        positions[:1] = np.nan
+        positions[1:] = np.diff(signal)
+        
+        # 所有列一次性构造 DataFrame，避免逐列插入
+        signals = pd.DataFrame({
+            'signal': signal,
+            'short_mavg': short_mavg,
+            'long_mavg': long_mavg,
+            'positions': positions,
+        }, index=data.index)
         
         return signals
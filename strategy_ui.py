@@ -3,11 +3,16 @@ Simple Trading Strategy UI for IBKR Quant Project
 Focuses on core functionality: connection, parameters, execution and logging
 """
 
+import asyncio
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
+from config import IB_CONFIG
 from range_strategy import RangeStrategy
-from ib_insync import *
+from src.core.logger import setup_logger
+from ib_insync import IB
 import logging
 
 class StrategyUI:
@@ -33,11 +38,25 @@ class StrategyUI:
         self.ib = IB()  # IBKR connection
         self.strategy = None  # Active strategy
         
+        # IBKR I/O and the strategy run on an asyncio loop in a worker thread,
+        # so Tk only ever paints and handles clicks
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self._run_loop, daemon=True).start()
+        
+        # Log lines from any thread, flushed to the widget in batches
+        self.log_queue = queue.Queue()
+        
         # Setup UI components
         self.create_connection_panel()
         self.create_parameter_panel() 
         self.create_control_panel()
         self.create_log_panel()
+        self.root.after(100, self.drain_log_queue)
+        
+    def _run_loop(self):
+        """Worker thread body; ib_insync looks the loop up via the thread's event loop policy"""
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
         
     def create_connection_panel(self):
         """Create connection management UI"""
@@ -103,26 +122,48 @@ class StrategyUI:
         self.log_text.configure(yscrollcommand=scrollbar.set)
         
     def log(self, message):
-        """Add message to log with timestamp"""
+        """Queue a timestamped log message; safe to call from any thread"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.log_text.see(tk.END)
+        self.log_queue.put(f"[{timestamp}] {message}\n")
         
-    def connect_ibkr(self):
-        """Connect to IBKR TWS/Gateway"""
+    def drain_log_queue(self, max_batch=200):
+        """Flush queued log messages to the widget with a single insert"""
+        batch = []
         try:
-            self.ib.connect('127.0.0.1', 7497, clientId=1)
-            self.conn_status.config(text="Connected", foreground="green")
-            self.log("Successfully connected to IBKR")
-        except Exception as e:
+            while len(batch) < max_batch:
+                batch.append(self.log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if batch:
+            self.log_text.insert(tk.END, ''.join(batch))
+            self.log_text.see(tk.END)
+        self.root.after(100, self.drain_log_queue)
+        
+    def connect_ibkr(self):
+        """Connect to IBKR TWS/Gateway without blocking the UI"""
+        self.conn_status.config(text="Connecting...", foreground="orange")
+        future = asyncio.run_coroutine_threadsafe(
+            self.ib.connectAsync(IB_CONFIG['host'], IB_CONFIG['port'], clientId=IB_CONFIG['client_id']),
+            self.loop
+        )
+        # The callback runs on the worker thread; hand the result back to Tk
+        future.add_done_callback(lambda f: self.root.after(0, self.on_connected, f))
+        
+    def on_connected(self, future):
+        """Update connection status once connectAsync finishes; runs on the Tk thread"""
+        if future.cancelled() or future.exception():
+            error = "cancelled" if future.cancelled() else str(future.exception())
             self.conn_status.config(text="Connection failed", foreground="red")
-            self.log(f"Connection failed: {str(e)}")
-            messagebox.showerror("Connection Error", f"Failed to connect to IBKR: {str(e)}")
+            self.log(f"Connection failed: {error}")
+            messagebox.showerror("Connection Error", f"Failed to connect to IBKR: {error}")
+            return
+        self.conn_status.config(text="Connected", foreground="green")
+        self.log("Successfully connected to IBKR")
 
     def disconnect_ibkr(self):
         """Disconnect from IBKR"""
         if self.ib.isConnected():
-            self.ib.disconnect()
+            self.loop.call_soon_threadsafe(self.ib.disconnect)
             self.conn_status.config(text="Disconnected", foreground="red")
             self.log("Disconnected from IBKR")
             
@@ -164,8 +205,10 @@ class StrategyUI:
             
         try:
             params = self.get_parameters()
+            params['account'] = IB_CONFIG['account']
             self.strategy = RangeStrategy(self.ib, params['symbol'], params)
-            self.strategy.run()
+            future = asyncio.run_coroutine_threadsafe(self.strategy.run(), self.loop)
+            future.add_done_callback(self.on_strategy_done)
             self.log("Strategy started successfully")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to start strategy: {str(e)}")
@@ -175,7 +218,7 @@ class StrategyUI:
         """Stop the trading strategy"""
         if self.strategy:
             try:
-                self.strategy.disconnect()
+                self.loop.call_soon_threadsafe(self.strategy.stop)
                 self.strategy = None
                 self.log("Strategy stopped successfully")
             except Exception as e:
@@ -184,7 +227,15 @@ class StrategyUI:
         else:
             messagebox.showinfo("Info", "No active strategy to stop")
 
+    def on_strategy_done(self, future):
+        """Report how the strategy task ended; runs on the worker thread"""
+        if future.cancelled():
+            return
+        if future.exception():
+            self.log(f"Strategy stopped with error: {future.exception()}")
+
 if __name__ == '__main__':
+    setup_logger()
     root = tk.Tk()
     app = StrategyUI(root)
     root.mainloop()
@@ -2,24 +2,93 @@
 Strategy UI Implementation
 """
 
+import asyncio
+import queue
 import tkinter as tk
 from tkinter import ttk, messagebox
 import json
-from datetime import datetime
-import matplotlib.pyplot as plt
+import logging
+import re
+import time
+import numpy as np
+import matplotlib.style
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from config import IB_CONFIG
 from range_strategy import RangeStrategy
-from ib_insync import *
+from src.core.logger import setup_logger
+from ib_insync import IB, Stock
 
+# Price history is a single dense line: simplify paths aggressively and
+# let Agg render long series in chunks
+matplotlib.style.use('fast')
+matplotlib.rcParams['path.simplify_threshold'] = 1.0
+matplotlib.rcParams['agg.path.chunksize'] = 10000
+
+# Plausible ticker shape, checked before any IBKR round trip
+_SYM_RE = re.compile(r'^[A-Z.\-]{1,10}$')
+
+class _UILogHandler(logging.Handler):
+    """Route log records into the UI trade log; safe from any thread"""
+    def __init__(self, ui):
+        super().__init__()
+        self.ui = ui
+        
+    def emit(self, record):
+        self.ui.log_message(self.format(record))
+        
 class StrategyUI:
+    LOG_MAX_LINES = 2000  # Older trade log lines are dropped past this
+    
+    # Strategy parameters: (label, config key, default, type)
+    _PARAMS = (
+        ('Symbol', 'symbol', 'AAPL', str),
+        ('ADX Period', 'adx_period', 14, int),
+        ('ADX Threshold', 'adx_threshold', 20, float),
+        ('Bollinger Period', 'bollinger_ma_period', 20, int),
+        ('Bollinger Std Dev', 'bollinger_std_dev', 2, float),
+        ('RSI Period', 'rsi_period', 14, int),
+        ('RSI Oversold', 'rsi_oversold', 30, float),
+        ('ATR Period', 'atr_period', 14, int),
+        ('Stop Loss ATR Multiplier', 'stop_loss_atr_multiplier', 1.5, float),
+        ('Profit Target %', 'profit_target_pct', 0.015, float),
+        ('Risk per Trade %', 'risk_per_trade_pct', 0.01, float),
+        ('Max Trades per Day', 'max_trades_per_day', 5, int),
+        ('Daily Loss Limit %', 'daily_loss_limit_pct', 0.02, float)
+    )
+    
+    # Spinbox (from_, to, increment) for each numeric parameter
+    _BOUNDS = {
+        'adx_period': (2, 100, 1),
+        'adx_threshold': (0, 100, 1),
+        'bollinger_ma_period': (2, 200, 1),
+        'bollinger_std_dev': (0.5, 5, 0.1),
+        'rsi_period': (2, 100, 1),
+        'rsi_oversold': (0, 100, 1),
+        'atr_period': (2, 100, 1),
+        'stop_loss_atr_multiplier': (0.1, 10, 0.1),
+        'profit_target_pct': (0.001, 0.5, 0.001),
+        'risk_per_trade_pct': (0.001, 0.1, 0.001),
+        'max_trades_per_day': (1, 100, 1),
+        'daily_loss_limit_pct': (0.001, 0.5, 0.001)
+    }
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Range Trading Strategy")
         self.root.geometry("1200x800")
         
+        # ib_insync runs on this asyncio loop, pumped from the Tk mainloop
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        
+        # (kind, payload) messages for the Tk thread; the only way other code touches widgets
+        self.ui_q = queue.Queue()
+        
         # Initialize IBKR connection
         self.ib = IB()
         self.strategy = None
+        self._contract_cache = {}  # Qualified contracts by symbol, valid per connection
         
         # Create UI components
         self.create_connection_frame()
@@ -28,6 +97,22 @@ class StrategyUI:
         self.create_log_frame()
         self.create_chart_frame()
         
+        # Non-blocking status line; dialogs are reserved for errors
+        self.status_bar = ttk.Label(self.root, anchor='w')
+        self.status_bar.grid(row=4, column=0, columnspan=2, sticky="ew", padx=10, pady=(0, 5))
+        
+        # Strategy log output goes to the trade log through the UI queue
+        logging.getLogger('RangeStrategy').addHandler(_UILogHandler(self))
+        
+        self._pump()
+        self._drain()
+        
+    def _pump(self):
+        """Run one pass of the asyncio loop, then hand control back to Tk"""
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+        self.root.after(20, self._pump)
+        
     def create_connection_frame(self):
         """Create connection controls"""
         frame = ttk.LabelFrame(self.root, text="IBKR Connection", padding=10)
@@ -46,27 +131,18 @@ class StrategyUI:
         
         # Create parameter controls
         self.param_vars = {}
-        params = [
-            ('Symbol', 'symbol', 'AAPL'),
-            ('ADX Period', 'adx_period', 14),
-            ('ADX Threshold', 'adx_threshold', 20),
-            ('Bollinger Period', 'bollinger_ma_period', 20),
-            ('Bollinger Std Dev', 'bollinger_std_dev', 2),
-            ('RSI Period', 'rsi_period', 14),
-            ('RSI Oversold', 'rsi_oversold', 30),
-            ('ATR Period', 'atr_period', 14),
-            ('Stop Loss ATR Multiplier', 'stop_loss_atr_multiplier', 1.5),
-            ('Profit Target %', 'profit_target_pct', 0.015),
-            ('Risk per Trade %', 'risk_per_trade_pct', 0.01),
-            ('Max Trades per Day', 'max_trades_per_day', 5),
-            ('Daily Loss Limit %', 'daily_loss_limit_pct', 0.02)
-        ]
-        
-        for i, (label, key, default) in enumerate(params):
+        var_classes = {str: tk.StringVar, int: tk.IntVar, float: tk.DoubleVar}
+        for i, (label, key, default, type_) in enumerate(self._PARAMS):
             ttk.Label(frame, text=label).grid(row=i, column=0, sticky="e", padx=5, pady=2)
-            var = tk.StringVar(value=str(default))
+            var = var_classes[type_](value=default)
             self.param_vars[key] = var
-            ttk.Entry(frame, textvariable=var, width=10).grid(row=i, column=1, sticky="w", padx=5, pady=2)
+            if key in self._BOUNDS:
+                # Arrow keys and wheel step within the bounds inside Tk itself
+                from_, to, increment = self._BOUNDS[key]
+                field = ttk.Spinbox(frame, textvariable=var, width=10, from_=from_, to=to, increment=increment)
+            else:
+                field = ttk.Entry(frame, textvariable=var, width=10)
+            field.grid(row=i, column=1, sticky="w", padx=5, pady=2)
             
     def create_controls_frame(self):
         """Create strategy controls"""
@@ -94,42 +170,74 @@ class StrategyUI:
         frame = ttk.LabelFrame(self.root, text="Price Chart", padding=10)
         frame.grid(row=3, column=0, columnspan=2, sticky="nsew", padx=10, pady=5)
         
-        self.fig, self.ax = plt.subplots(figsize=(10, 4))
-        self.canvas = FigureCanvasTkAgg(self.fig, master=frame)
+        # The figure and canvas are built by _ensure_chart on first use
+        self._chart_frame = frame
+        self.canvas = None
+        
+    def _ensure_chart(self):
+        """Create the figure, axes and canvas the first time the chart is drawn"""
+        if self.canvas is not None:
+            return
+            
+        # Plain Figure, not pyplot: nothing is registered in pyplot's global figure manager
+        self.fig = Figure(figsize=(10, 4))
+        self.ax = self.fig.add_subplot(111)
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self._chart_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
+        # Persistent price line, excluded from full redraws and blitted on
+        # top of a cached background instead
+        self.price_line, = self.ax.plot([], [], lw=1, animated=True)
+        self.ax.set_xlabel("Time")
+        self.ax.set_ylabel("Price")
+        # Fixed margins instead of tight_layout, which re-measures every artist
+        self.fig.subplots_adjust(left=0.08, right=0.98, bottom=0.12, top=0.9)
+        self.bg = None
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        
+    def _on_draw(self, event):
+        """Cache the static background after every full redraw"""
+        self.bg = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.ax.draw_artist(self.price_line)
+        
     def connect_ibkr(self):
-        """Connect to IBKR"""
-        try:
-            self.ib.connect('127.0.0.1', 7497, clientId=1)
-            self.connection_status.config(text="Connected", foreground="green")
-            messagebox.showinfo("Success", "Connected to IBKR")
-        except Exception as e:
-            messagebox.showerror("Connection Error", str(e))
+        """Connect to IBKR without blocking the UI"""
+        self.connection_status.config(text="Connecting...", foreground="orange")
+        future = asyncio.ensure_future(
+            self.ib.connectAsync(IB_CONFIG['host'], IB_CONFIG['port'], clientId=IB_CONFIG['client_id']),
+            loop=self.loop
+        )
+        future.add_done_callback(lambda f: self.ui_q.put(('connected', f)))
+        
+    def _on_connected(self, future):
+        """Update connection status once connectAsync finishes, on the Tk thread"""
+        if future.cancelled() or future.exception():
+            self.connection_status.config(text="Disconnected", foreground="red")
+            error = "Connection cancelled" if future.cancelled() else str(future.exception())
+            messagebox.showerror("Connection Error", error)
+            return
+        self.connection_status.config(text="Connected", foreground="green")
+        self.status_bar.config(text="Connected to IBKR")
             
     def disconnect_ibkr(self):
         """Disconnect from IBKR"""
         try:
             self.ib.disconnect()
+            self._contract_cache.clear()
             self.connection_status.config(text="Disconnected", foreground="red")
-            messagebox.showinfo("Disconnected", "Disconnected from IBKR")
+            self.status_bar.config(text="Disconnected from IBKR")
         except Exception as e:
             messagebox.showerror("Disconnection Error", str(e))
             
     def get_config(self):
         """Get current configuration from UI"""
-        config = {}
-        for key, var in self.param_vars.items():
-            try:
-                # Convert to appropriate type
-                if '.' in var.get():
-                    config[key] = float(var.get())
-                else:
-                    config[key] = int(var.get())
-            except ValueError:
-                messagebox.showerror("Invalid Value", f"Invalid value for {key}")
-                return None
-        return config
+        try:
+            # Typed Tk variables hand back int/float/str directly; only text
+            # typed over a Spinbox can still fail to parse
+            return {key: var.get() for key, var in self.param_vars.items()}
+        except tk.TclError as e:
+            messagebox.showerror("Invalid Value", str(e))
+            return None
     
     def start_strategy(self):
         """Start the trading strategy"""
@@ -141,42 +249,73 @@ class StrategyUI:
         if config is None:
             return
             
+        # The symbol field may hold a list for Analyze History; trading takes exactly one
+        config['symbol'] = config['symbol'].strip().upper()
+        if not _SYM_RE.match(config['symbol']):
+            messagebox.showerror("Error", "Please enter a single valid stock symbol to trade")
+            return
+        config['account'] = IB_CONFIG['account']
+            
         self.strategy = RangeStrategy(
             ib=self.ib,
             symbol=config['symbol'],
             config=config
         )
         
-        # Start strategy in a separate thread
-        import threading
-        self.strategy_thread = threading.Thread(target=self.strategy.run, daemon=True)
-        self.strategy_thread.start()
-        messagebox.showinfo("Strategy Started", "Range trading strategy is running")
+        # Run the strategy as a task on the pumped loop the IB connection lives on
+        self.strategy_task = self.loop.create_task(self.strategy.run())
+        self.strategy_task.add_done_callback(lambda t: self.ui_q.put(('strategy', t)))
+        self.status_bar.config(text="Range trading strategy is running")
         
     def stop_strategy(self):
         """Stop the trading strategy"""
         if self.strategy:
             self.strategy.stop()
-            messagebox.showinfo("Strategy Stopped", "Range trading strategy has been stopped")
+            self.status_bar.config(text="Range trading strategy has been stopped")
+            
+    def _on_strategy_done(self, task):
+        """Report how the strategy task ended on the Tk thread"""
+        if not task.cancelled() and task.exception():
+            self.status_bar.config(text="Range trading strategy stopped with an error")
+            messagebox.showerror("Strategy Error", str(task.exception()))
+            return
+        self.status_bar.config(text="Range trading strategy has been stopped")
             
     def analyze_history(self):
-        """Analyze historical data"""
+        """Analyze historical data for one or more comma-separated symbols"""
         if not self.ib.isConnected():
             messagebox.showerror("Error", "Not connected to IBKR")
             return
             
-        symbol = self.param_vars['symbol'].get()
-        if not symbol:
+        symbols = tuple(s.strip() for s in self.param_vars['symbol'].get().upper().split(',') if s.strip())
+        if not symbols:
             messagebox.showerror("Error", "Please enter a valid stock symbol")
             return
             
-        try:
-            contract = Stock(symbol, 'SMART', 'USD')
-            contract = self.ib.qualifyContracts(contract)[0]
+        invalid = [s for s in symbols if not _SYM_RE.match(s)]
+        if invalid:
+            messagebox.showerror("Error", f"Invalid stock symbol(s): {', '.join(invalid)}")
+            return
             
-            # Get historical data
-            bars = self.ib.reqHistoricalData(
-                contract,
+        # Network I/O runs on the pumped loop; the result comes back through the UI queue
+        task = self.loop.create_task(self._fetch_history(symbols))
+        task.add_done_callback(lambda t: self.ui_q.put(('history', (t, symbols))))
+        
+    async def _fetch_history(self, symbols):
+        """Qualify the contracts and request historical bars for all symbols concurrently"""
+        pending = {s: Stock(s, 'SMART', 'USD') for s in symbols if s not in self._contract_cache}
+        if pending:
+            # Qualifies in place; contracts IBKR does not recognise keep conId 0
+            await self.ib.qualifyContractsAsync(*pending.values())
+            unknown = [s for s, contract in pending.items() if not contract.conId]
+            if unknown:
+                raise ValueError(f"Unknown symbol(s): {', '.join(unknown)}")
+            self._contract_cache.update(pending)
+        
+        # Get historical data
+        return await asyncio.gather(*(
+            self.ib.reqHistoricalDataAsync(
+                self._contract_cache[symbol],
                 endDateTime='',
                 durationStr='1 D',
                 barSizeSetting='1 hour',
@@ -184,31 +323,93 @@ class StrategyUI:
                 useRTH=True,
                 formatDate=1
             )
+            for symbol in symbols
+        ))
+        
+    def _on_history(self, task, symbols):
+        """Handle the finished history requests on the Tk thread"""
+        if task.cancelled():
+            return
+        if task.exception():
+            messagebox.showerror("Error", f"Failed to get historical data: {str(task.exception())}")
+            return
             
-            if not bars:
-                messagebox.showinfo("No Data", "No historical data available for this symbol")
-                return
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to get historical data: {str(e)}")
+        results = [(symbol, bars) for symbol, bars in zip(symbols, task.result()) if bars]
+        if not results:
+            self.status_bar.config(text="No historical data available for this symbol")
             return
+            
+        # Chart the first symbol with data; summarise every symbol in the log
+        for symbol, bars in results:
+            self.log_message(f"{symbol}: {len(bars)} bars, last close {bars[-1].close}")
+        self._draw_history(results[0][1], results[0][0])
+        
+    def _draw_history(self, bars, symbol):
+        """Plot historical closes"""
+        self._ensure_chart()
+        prices = np.fromiter((bar.close for bar in bars), dtype=np.float64, count=len(bars))
+        self.price_line.set_data(np.arange(len(prices)), prices)
         
-        # Plot data
-        self.ax.clear()
-        prices = [bar.close for bar in bars]
-        self.ax.plot(prices)
+        # Title and axis limits live in the background; redraw it only when they change
+        view = (self.ax.get_title(), self.ax.get_xlim(), self.ax.get_ylim())
         self.ax.set_title(f"{symbol} Price History")
-        self.ax.set_xlabel("Time")
-        self.ax.set_ylabel("Price")
-        self.canvas.draw()
+        # Limits straight from the data; relim/autoscale_view would walk every artist
+        low, high = np.nanmin(prices), np.nanmax(prices)
+        pad = 0.01 * (high - low) or 1.0
+        self.ax.set_xlim(0, max(len(prices) - 1, 1))
+        self.ax.set_ylim(low - pad, high + pad)
+        if self.bg is None or view != (self.ax.get_title(), self.ax.get_xlim(), self.ax.get_ylim()):
+            # Coalesced into one render on Tk's next idle tick; _on_draw recaches the background
+            self.canvas.draw_idle()
+            return
+            
+        self.canvas.restore_region(self.bg)
+        self.ax.draw_artist(self.price_line)
+        self.canvas.blit(self.fig.bbox)
         
     def log_message(self, message):
-        """Add message to log"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
+        """Add message to log; safe to call from any thread"""
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")  # no datetime object per line
+        self.ui_q.put(('log', f"[{timestamp}] {message}\n"))
+        
+    def _drain(self):
+        """Apply queued UI messages on the Tk thread"""
+        lines = []
+        try:
+            while True:
+                kind, payload = self.ui_q.get_nowait()
+                if kind == 'log':
+                    lines.append(payload)
+                else:
+                    self._handle(kind, payload)
+        except queue.Empty:
+            pass
+        finally:
+            # A failing handler must not lose collected lines or stop the drain
+            if lines:
+                self._append_log(''.join(lines))
+            self.root.after(50, self._drain)
+        
+    def _handle(self, kind, payload):
+        """Dispatch a non-log UI message"""
+        if kind == 'history':
+            self._on_history(*payload)
+        elif kind == 'strategy':
+            self._on_strategy_done(payload)
+        elif kind == 'connected':
+            self._on_connected(payload)
+            
+    def _append_log(self, text):
+        """Write log text in one insert and cap the widget at LOG_MAX_LINES"""
+        self.log_text.insert(tk.END, text)
+        # 'end-1c' is on the empty line after the last newline
+        lines = int(self.log_text.index('end-1c').split('.')[0]) - 1
+        if lines > self.LOG_MAX_LINES:
+            self.log_text.delete('1.0', f'{lines - self.LOG_MAX_LINES + 1}.0')
         self.log_text.see(tk.END)
         
 if __name__ == '__main__':
+    setup_logger()
     root = tk.Tk()
     app = StrategyUI(root)
     root.mainloop()
@@ -0,0 +1,50 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import talib
+
+from range_strategy import RangeStrategy
+
+
+def _random_ohlc(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    high = close + rng.random(n)
+    low = close - rng.random(n)
+    return high, low, close
+
+
+def _streamed(config, high, low, close):
+    """Feed the bars one at a time and record the indicators after each bar"""
+    strategy = RangeStrategy(symbol='TEST', config=config)
+    rows = []
+    for h, l, c in zip(high, low, close):
+        strategy.update_market_data(SimpleNamespace(open=c, high=h, low=l, close=c, volume=1.0,
+                                                    date=datetime(2024, 1, 2, 10, 0)))
+        rows.append((strategy.indicators_ready, strategy._adx, strategy._atr, strategy._rsi,
+                     strategy._bb_upper, strategy._bb_middle, strategy._bb_lower))
+    ready, *values = map(np.array, zip(*rows))
+    return ready, values
+
+
+def test_streaming_indicators_match_talib():
+    for seed in range(3):
+        for period, bb_period in ((5, 10), (14, 20), (20, 30)):
+            config = {'adx_period': period, 'atr_period': period, 'rsi_period': period,
+                      'bollinger_ma_period': bb_period, 'bollinger_std_dev': 2}
+            high, low, close = _random_ohlc(seed=seed)
+            ready, (adx, atr, rsi, upper, middle, lower) = _streamed(config, high, low, close)
+            assert ready.any() and not ready[:period].any()
+
+            ref_upper, ref_middle, ref_lower = talib.BBANDS(close, bb_period, 2, 2, 0)
+            for got, expected in ((adx, talib.ADX(high, low, close, period)),
+                                  (atr, talib.ATR(high, low, close, period)),
+                                  (rsi, talib.RSI(close, period)),
+                                  (upper, ref_upper), (middle, ref_middle), (lower, ref_lower)):
+                np.testing.assert_allclose(got[ready], expected[ready], rtol=1e-9, atol=1e-9)
+
+
+if __name__ == '__main__':
+    test_streaming_indicators_match_talib()
+    print("ok")
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from strategy import MovingAverageCrossoverStrategy, _rolling_mean
+
+
+def _close_with_gaps(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    close[50] = np.nan
+    close[120:140] = np.nan  # longer than the short window: some windows are all NaN
+    return close
+
+
+def test_rolling_mean_matches_pandas_with_nans():
+    close = _close_with_gaps()
+    for window in (1, 5, 20, 50):
+        expected = pd.Series(close).rolling(window, min_periods=1).mean().to_numpy()
+        np.testing.assert_allclose(_rolling_mean(close, window), expected, rtol=1e-10, equal_nan=True)
+
+
+def test_generate_signals_matches_pandas_with_nans():
+    data = pd.DataFrame({'Close': _close_with_gaps()})
+    signals = MovingAverageCrossoverStrategy(5, 20).generate_signals(data)
+
+    short_mavg = data['Close'].rolling(5, min_periods=1).mean()
+    long_mavg = data['Close'].rolling(20, min_periods=1).mean()
+    signal = (short_mavg > long_mavg).astype(float)
+    np.testing.assert_array_equal(signals['signal'].to_numpy(), signal.to_numpy())
+    np.testing.assert_array_equal(signals['positions'].to_numpy(), signal.diff().to_numpy())
+
+
+if __name__ == '__main__':
+    test_rolling_mean_matches_pandas_with_nans()
+    test_generate_signals_matches_pandas_with_nans()
+    print("ok")